@@ -3,7 +3,7 @@ from .aspectratio import AspectRatioImageSize, AspectRatioResizeImage, MarkdownM
 from .huggingfacedownloader import HuggingFaceDownloader
 from .gitcloner import GitCloneManager
 from .transparentvideosave import TransparentVideoSave
-from .jpg_exif_strip_node import JpgExifStripNode  
+from .jpg_exif_strip_node import JpgExifStripNode, MetadataStripDirectoryNode
 
 NODE_CLASS_MAPPINGS = {
     "AspectRatioImageSize": AspectRatioImageSize,
@@ -13,6 +13,7 @@ NODE_CLASS_MAPPINGS = {
     "GitCloneManager": GitCloneManager,
     "TransparentVideoSave": TransparentVideoSave,
     "JpgExifStrip": JpgExifStripNode,  
+    "MetadataStripDirectory": MetadataStripDirectoryNode,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -23,6 +24,7 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "GitCloneManager": "🔧 Git Repository Clone Manager",
     "TransparentVideoSave": "🔧 TransparentVideoSave",
     "JpgExifStrip": "🖼️ JPG Converter & EXIF Stripper",  
+    "MetadataStripDirectory": "🧹 Metadata Stripper (Directory, Lossless)",
 }
 
 NODE_CATEGORIES = {
@@ -33,4 +35,5 @@ NODE_CATEGORIES = {
     "GitCloneManager": "STUDIO NODES",
     "TransparentVideoSave": "STUDIO NODES",
     "JpgExifStrip": "STUDIO NODES",  # ← add this
+    "MetadataStripDirectory": "STUDIO NODES",
 }
@@ -3,15 +3,23 @@ ComfyUI Custom Node: JPG Converter & EXIF Stripper
 Converts any image to JPEG, removes all EXIF metadata,
 displays the result as a live preview inside the node,
 and optionally saves the file to a named subfolder of ComfyUI/output/.
+
+Also provides a directory mode that strips metadata from existing
+JPEG / PNG / WebP files in place without re-encoding them.
 """
 
 import os
 import re
+import shutil
+import struct
+import threading
 import uuid
 import torch
 import numpy as np
 from PIL import Image
 import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import folder_paths  # ComfyUI built-in path helper
 
 
@@ -28,6 +36,11 @@ class JpgExifStripNode:
     RETURN_NAMES = ("image",)
     OUTPUT_NODE = True  # Required to allow ui dict to be returned
 
+    # Serialises output filename allocation across threads and concurrent prompts
+    _reserve_lock = threading.Lock()
+    # (output_dir, prefix) → next index to try; seeded once per folder by a directory scan
+    _next_index = {}
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -80,7 +93,26 @@ class JpgExifStripNode:
                         "tooltip": "Prefix for saved filenames, e.g. 'img' → img_0001.jpg",
                     },
                 ),
-            }
+            },
+            "optional": {
+                "decode_output": (
+                    "BOOLEAN",
+                    {
+                        "default": True,
+                        "tooltip": "Decode the JPEG back into the image output. Turn off when only "
+                                   "the saved file matters; the input image is then passed through",
+                    },
+                ),
+                "workers": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 64,
+                        "tooltip": "Images processed in parallel (0 = one per CPU core)",
+                    },
+                ),
+            },
         }
 
     # ------------------------------------------------------------------
@@ -97,11 +129,17 @@ class JpgExifStripNode:
         return torch.from_numpy(np.array(pil_img).astype(np.float32) / 255.0)
 
     def _jpeg_round_trip(
-        self, pil_img: Image.Image, quality: int, optimize: bool, progressive: bool
-    ) -> Image.Image:
+        self,
+        pil_img: Image.Image,
+        quality: int,
+        optimize: bool,
+        progressive: bool,
+        decode: bool = True,
+    ) -> tuple:
         """
         Save image to an in-memory JPEG buffer (no exif= kwarg → zero metadata),
         then reload it. This guarantees the result is a clean JPEG with no EXIF.
+        Returns (jpeg_bytes, clean_pil); clean_pil is None when decode is False.
         """
         buf = io.BytesIO()
         pil_img.save(
@@ -111,19 +149,22 @@ class JpgExifStripNode:
             optimize=optimize,
             progressive=progressive,
         )
+        if not decode:
+            return buf.getvalue(), None
         buf.seek(0)
-        return Image.open(buf).convert("RGB")
+        return buf.getvalue(), Image.open(buf).convert("RGB")
 
-    def _save_preview(self, pil_img: Image.Image) -> dict:
+    def _save_preview(self, jpeg_bytes: bytes) -> dict:
         """
-        Save the image to ComfyUI's temp folder so the node can display it.
+        Write the clean JPEG bytes to ComfyUI's temp folder so the node can display them.
         Returns the image-info dict expected by the frontend.
         """
         temp_dir = folder_paths.get_temp_directory()
         os.makedirs(temp_dir, exist_ok=True)
 
         filename = f"jpg_exif_strip_{uuid.uuid4().hex[:12]}.jpg"
-        pil_img.save(os.path.join(temp_dir, filename), format="JPEG", quality=95)
+        with open(os.path.join(temp_dir, filename), "wb") as f:
+            f.write(jpeg_bytes)
 
         return {"filename": filename, "subfolder": "", "type": "temp"}
 
@@ -132,32 +173,24 @@ class JpgExifStripNode:
         """Strip characters that are unsafe in directory / file names."""
         return re.sub(r'[\\/:*?"<>|]', "_", name).strip() or "jpg_converted"
 
-    def _next_filename(self, output_dir: str, prefix: str) -> str:
+    def _scan_next_index(self, output_dir: str, prefix: str) -> int:
         """
-        Return the next auto-incremented filename inside output_dir.
+        Return the next auto-increment index inside output_dir.
         Scans existing files matching '<prefix>_NNNN.jpg' and picks max+1.
         """
-        pattern = re.compile(rf"^{re.escape(prefix)}_(\d{{4}})\.jpg$", re.IGNORECASE)
+        pattern = re.compile(rf"^{re.escape(prefix)}_(\d{{4,}})\.jpg$", re.IGNORECASE)
         existing = [
             int(m.group(1))
             for f in os.listdir(output_dir)
             if (m := pattern.match(f))
         ]
-        index = (max(existing) + 1) if existing else 1
-        return f"{prefix}_{index:04d}.jpg"
+        return (max(existing) + 1) if existing else 1
 
-    def _save_to_output(
-        self,
-        pil_img: Image.Image,
-        folder_name: str,
-        filename_prefix: str,
-        quality: int,
-        optimize: bool,
-        progressive: bool,
-    ) -> str:
+    def _reserve_output_path(self, folder_name: str, filename_prefix: str) -> str:
         """
-        Save the clean JPEG to ComfyUI/output/<folder_name>/.
-        Returns the full path of the saved file.
+        Claim the next free filename in ComfyUI/output/<folder_name>/ by creating
+        it empty, so concurrent saves never pick the same name.
+        Returns the full path of the reserved file.
         """
         safe_folder = self._sanitize(folder_name)
         safe_prefix = self._sanitize(filename_prefix)
@@ -166,18 +199,63 @@ class JpgExifStripNode:
         output_dir = os.path.join(output_base, safe_folder)
         os.makedirs(output_dir, exist_ok=True)
 
-        filename = self._next_filename(output_dir, safe_prefix)
-        filepath = os.path.join(output_dir, filename)
+        key = (os.path.normcase(os.path.abspath(output_dir)), safe_prefix.lower())
+        with self._reserve_lock:
+            index = self._next_index.get(key)
+            if index is None:
+                index = self._scan_next_index(output_dir, safe_prefix)
+            # O_EXCL makes the create fail if another process already took the name
+            while True:
+                filepath = os.path.join(output_dir, f"{safe_prefix}_{index:04d}.jpg")
+                try:
+                    os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    break
+                except FileExistsError:
+                    index += 1
+            self._next_index[key] = index + 1
+        return filepath
 
-        pil_img.save(
-            filepath,
-            format="JPEG",
-            quality=quality,
-            optimize=optimize,
-            progressive=progressive,
-        )
+    def _save_to_output(self, jpeg_bytes: bytes, filepath: str) -> str:
+        """
+        Write the clean JPEG bytes to a path reserved by _reserve_output_path.
+        Returns the full path of the saved file.
+        """
+        with open(filepath, "wb") as f:
+            f.write(jpeg_bytes)
         return filepath
 
+    def _process_image(
+        self,
+        frame: torch.Tensor,
+        quality: int,
+        optimize: bool,
+        progressive: bool,
+        decode_output: bool,
+        filepath,
+    ) -> tuple:
+        """
+        Run the full per-image pipeline. Pillow releases the GIL while encoding
+        and decoding, so several of these run in parallel threads.
+        Returns (preview_info, tensor or None).
+        """
+        # 1. Tensor → PIL
+        pil_img = self._tensor_to_pil(frame)
+
+        # 2. JPEG round-trip → strips ALL metadata (encoded once, bytes reused below)
+        jpeg_bytes, clean_pil = self._jpeg_round_trip(
+            pil_img, quality, optimize, progressive, decode_output
+        )
+
+        # 3. In-node preview (always) — the exact bytes that get saved
+        preview = self._save_preview(jpeg_bytes)
+
+        # 4. Optional save to output folder
+        if filepath is not None:
+            self._save_to_output(jpeg_bytes, filepath)
+
+        # 5. PIL → tensor
+        return preview, self._pil_to_tensor(clean_pil) if decode_output else None
+
     # ------------------------------------------------------------------
     # Main execution
     # ------------------------------------------------------------------
@@ -191,38 +269,46 @@ class JpgExifStripNode:
         save_output: bool = False,
         folder_name: str = "jpg_converted",
         filename_prefix: str = "img",
+        decode_output: bool = True,
+        workers: int = 0,
     ):
         """
         Convert image(s) to JPEG, strip EXIF, show in-node preview,
         and optionally save to ComfyUI/output/<folder_name>/.
         """
         batch_size = image.shape[0]
-        result_tensors = []
-        preview_images = []
-        saved_paths = []
-
-        for i in range(batch_size):
-            # 1. Tensor → PIL
-            pil_img = self._tensor_to_pil(image[i])
-
-            # 2. JPEG round-trip → strips ALL metadata
-            clean_pil = self._jpeg_round_trip(pil_img, quality, optimize, progressive)
-
-            # 3. In-node preview (always)
-            preview_images.append(self._save_preview(clean_pil))
-
-            # 4. Optional save to output folder
-            if save_output:
-                path = self._save_to_output(
-                    clean_pil, folder_name, filename_prefix, quality, optimize, progressive
-                )
-                saved_paths.append(path)
-                print(f"[JpgExifStrip] Saved → {path}")
 
-            # 5. PIL → tensor
-            result_tensors.append(self._pil_to_tensor(clean_pil))
+        # Filenames are reserved up front so they follow batch order
+        saved_paths = [
+            self._reserve_output_path(folder_name, filename_prefix) if save_output else None
+            for _ in range(batch_size)
+        ]
+
+        max_workers = min(workers or os.cpu_count() or 1, batch_size)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map() yields in submission order, so results stay in batch order
+                results = list(executor.map(
+                    lambda i: self._process_image(
+                        image[i], quality, optimize, progressive, decode_output, saved_paths[i]
+                    ),
+                    range(batch_size),
+                ))
+        except Exception:
+            # Don't leave empty reserved files behind
+            for path in saved_paths:
+                if path is not None and os.path.exists(path) and os.path.getsize(path) == 0:
+                    os.remove(path)
+            raise
+
+        preview_images = [preview for preview, _ in results]
+        result_tensors = [tensor for _, tensor in results]
+        for path in saved_paths:
+            if path is not None:
+                print(f"[JpgExifStrip] Saved → {path}")
 
-        output_tensor = torch.stack(result_tensors, dim=0)
+        # Without the decode-back the input passes through unchanged
+        output_tensor = torch.stack(result_tensors, dim=0) if decode_output else image
 
         return {
             "ui": {"images": preview_images},
@@ -230,14 +316,332 @@ class JpgExifStripNode:
         }
 
 
+# ---------------------------------------------------------------------------
+# Lossless container-level metadata stripping
+# ---------------------------------------------------------------------------
+# Each parser walks the container headers only and returns
+# (ranges_to_drop, patches) or None when the file is not of that format.
+# Pixel data is never decoded; kept bytes are copied verbatim.
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+STRIP_TMP_SUFFIX = ".strip-tmp"
+
+
+def _jpeg_metadata_ranges(f):
+    """APP1 (EXIF / XMP) and APP13 (Photoshop / IPTC) segments before the first scan."""
+    if f.read(2) != b"\xff\xd8":
+        return None
+    ranges = []
+    while True:
+        start = f.tell()
+        if f.read(1) != b"\xff":
+            break
+        marker = f.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = f.read(1)
+        if not marker or marker[0] in (0xDA, 0xD9):
+            break  # SOS / EOI: everything from here on is copied verbatim
+        if 0xD0 <= marker[0] <= 0xD7 or marker[0] == 0x01:
+            continue  # standalone markers carry no length
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            break
+        end = f.tell() + struct.unpack(">H", length_bytes)[0] - 2
+        if marker[0] in (0xE1, 0xED):
+            ranges.append((start, end))
+        f.seek(end)
+    return ranges, {}
+
+
+def _png_metadata_ranges(f):
+    """tEXt, iTXt and zTXt chunks, plus eXIf."""
+    if f.read(8) != PNG_SIGNATURE:
+        return None
+    ranges = []
+    while True:
+        start = f.tell()
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        end = start + 12 + length  # length + type + data + CRC
+        if chunk_type in (b"tEXt", b"iTXt", b"zTXt", b"eXIf"):
+            ranges.append((start, end))
+        if chunk_type == b"IEND":
+            break
+        f.seek(end)
+    return ranges, {}
+
+
+def _webp_metadata_ranges(f):
+    """EXIF and XMP chunks; the RIFF size and VP8X flags are patched to match."""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WEBP":
+        return None
+    riff_end = 8 + struct.unpack("<I", header[4:8])[0]
+    ranges = []
+    flags_offset = flags = None
+    while f.tell() + 8 <= riff_end:
+        start = f.tell()
+        fourcc, size = struct.unpack("<4sI", f.read(8))
+        end = start + 8 + size + (size & 1)  # chunks are padded to even sizes
+        if fourcc == b"VP8X":
+            flags_offset, flags = start + 8, f.read(1)[0]
+        elif fourcc in (b"EXIF", b"XMP "):
+            ranges.append((start, end))
+        f.seek(end)
+    patches = {}
+    if ranges:
+        removed = sum(end - start for start, end in ranges)
+        patches[4] = struct.pack("<I", riff_end - 8 - removed)
+        if flags_offset is not None:
+            patches[flags_offset] = bytes([flags & ~0x0C])  # clear the EXIF and XMP flags
+    return ranges, patches
+
+
+METADATA_PARSERS = {
+    ".jpg": _jpeg_metadata_ranges,
+    ".jpeg": _jpeg_metadata_ranges,
+    ".png": _png_metadata_ranges,
+    ".webp": _webp_metadata_ranges,
+}
+
+
+def _copy_bytes(src, dst, count, chunk_size=1 << 20):
+    """Copy exactly count bytes (or up to EOF) from src to dst."""
+    while count > 0:
+        chunk = src.read(min(chunk_size, count))
+        if not chunk:
+            break
+        dst.write(chunk)
+        count -= len(chunk)
+
+
+def strip_file_metadata(path: str) -> tuple:
+    """
+    Rewrite one file without its metadata, keeping every other byte.
+    The result replaces the original atomically and keeps its timestamps;
+    a symlink is kept and the file it points to is rewritten.
+    Returns (status, bytes_removed) with status "stripped", "clean" or "skipped".
+    """
+    path = os.path.realpath(path)
+    parser = METADATA_PARSERS.get(os.path.splitext(path)[1].lower())
+    if parser is None:
+        return "skipped", 0
+    # Unique per call, so concurrent runs never share (or delete) each other's temp files
+    tmp_path = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex[:12]}{STRIP_TMP_SUFFIX}"
+    )
+    try:
+        with open(path, "rb") as src:
+            parsed = parser(src)
+            if parsed is None:
+                return "skipped", 0
+            ranges, patches = parsed
+            if not ranges:
+                return "clean", 0
+
+            src.seek(0)
+            with open(tmp_path, "xb") as dst:
+                position = 0
+                for start, end in ranges:
+                    _copy_bytes(src, dst, start - position)
+                    src.seek(end)
+                    position = end
+                shutil.copyfileobj(src, dst, 1 << 20)
+                # Patches sit in the header, ahead of every dropped range
+                for offset, data in patches.items():
+                    dst.seek(offset)
+                    dst.write(data)
+
+        stat = os.stat(path)
+        shutil.copymode(path, tmp_path)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return "stripped", sum(end - start for start, end in ranges)
+
+
+def strip_files_metadata(paths: list) -> list:
+    """Thread-pool task: strip a batch of files, one result tuple per path."""
+    results = []
+    for path in paths:
+        try:
+            status, removed = strip_file_metadata(path)
+            stat = os.stat(path)
+            results.append((path, status, removed, stat.st_size, stat.st_mtime_ns))
+        except Exception as e:
+            results.append((path, f"error: {e}", 0, 0, 0))
+    return results
+
+
+class MetadataStripDirectoryNode:
+    """
+    Strips EXIF / XMP / IPTC / text metadata from every JPEG, PNG and WebP
+    file in a directory tree by rewriting the containers in place.
+    Pixel data is never decoded, so the result is lossless.
+    """
+
+    CATEGORY = "image/postprocessing"
+    FUNCTION = "strip_directory"
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("report",)
+    OUTPUT_NODE = True
+
+    # Files per pool task; keeps scheduling overhead small on trees of tiny files
+    batch_size = 64
+    # Processed files are appended here so an interrupted run can resume
+    progress_file = ".metadata_strip_progress"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "directory": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "Folder to strip; relative paths are resolved inside ComfyUI/output/",
+                    },
+                ),
+                "recursive": (
+                    "BOOLEAN",
+                    {
+                        "default": True,
+                        "tooltip": "Also process all subfolders",
+                    },
+                ),
+                "resume": (
+                    "BOOLEAN",
+                    {
+                        "default": True,
+                        "tooltip": "Skip files already processed by an earlier (possibly interrupted) run",
+                    },
+                ),
+                "workers": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 64,
+                        "tooltip": "Worker threads (0 = one per CPU core)",
+                    },
+                ),
+            }
+        }
+
+    def _iter_files(self, root: str, recursive: bool):
+        """
+        Yield supported image paths under root. Symlinks are skipped, since they may
+        point outside root; so are temp files, which may belong to a concurrent run.
+        """
+        stack = [root]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError as e:
+                print(f"[MetadataStrip] Cannot read {e.filename}: {e.strerror}")
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.is_symlink() or entry.name.endswith(STRIP_TMP_SUFFIX):
+                    continue
+                elif os.path.splitext(entry.name)[1].lower() in METADATA_PARSERS:
+                    yield entry
+
+    def _load_progress(self, progress_path: str) -> dict:
+        """Map relative path → (size, mtime_ns) of files finished by earlier runs."""
+        done = {}
+        if not os.path.exists(progress_path):
+            return done
+        with open(progress_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t", 2)
+                if len(parts) == 3:
+                    done[parts[2]] = (int(parts[0]), int(parts[1]))
+        return done
+
+    def strip_directory(self, directory: str, recursive: bool = True, resume: bool = True, workers: int = 0):
+        """
+        Strip metadata from every supported file under directory.
+        The work is file I/O and byte copies, which release the GIL, so it runs in
+        threads; a process pool would have to re-import this node package in every
+        child (impossible under spawn) or fork the whole server process.
+        """
+        root = directory.strip()
+        if not root:
+            raise ValueError("MetadataStripDirectory needs a directory")
+        if not os.path.isabs(root):
+            root = os.path.join(folder_paths.get_output_directory(), root)
+        if not os.path.isdir(root):
+            raise ValueError(f"MetadataStripDirectory: {root} is not a directory")
+
+        progress_path = os.path.join(root, self.progress_file)
+        done = self._load_progress(progress_path) if resume else {}
+        counts = {"stripped": 0, "clean": 0, "skipped": 0, "resumed": 0}
+        errors = []
+        bytes_removed = 0
+        max_workers = workers or os.cpu_count() or 1
+
+        with open(progress_path, "a" if resume else "w", encoding="utf-8") as progress, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+
+            def collect(limit):
+                nonlocal bytes_removed
+                while len(pending) > limit:
+                    for path, status, removed, size, mtime_ns in pending.popleft().result():
+                        if status.startswith("error"):
+                            errors.append(f"{path}: {status[7:]}")
+                            continue
+                        counts[status] += 1
+                        bytes_removed += removed
+                        progress.write(f"{size}\t{mtime_ns}\t{os.path.relpath(path, root)}\n")
+                    progress.flush()
+
+            batch = []
+            for entry in self._iter_files(root, recursive):
+                if done:
+                    stat = entry.stat()
+                    if done.get(os.path.relpath(entry.path, root)) == (stat.st_size, stat.st_mtime_ns):
+                        counts["resumed"] += 1
+                        continue
+                batch.append(entry.path)
+                if len(batch) == self.batch_size:
+                    pending.append(executor.submit(strip_files_metadata, batch))
+                    batch = []
+                    # Bounded in-flight work keeps memory flat on huge trees
+                    collect(4 * max_workers)
+            if batch:
+                pending.append(executor.submit(strip_files_metadata, batch))
+            collect(0)
+
+        report = (
+            f"Stripped {counts['stripped']} file(s), {counts['clean']} already clean, "
+            f"{counts['resumed']} done in an earlier run, {counts['skipped']} not recognised; "
+            f"removed {bytes_removed / (1024 * 1024):.1f} MB of metadata in {root}"
+        )
+        if errors:
+            report += f"\n{len(errors)} error(s):\n" + "\n".join(errors[:20])
+        print(f"[MetadataStrip] {report}")
+        return {"ui": {"text": (report,)}, "result": (report,)}
+
+
 # ---------------------------------------------------------------------------
 # Node registration
 # ---------------------------------------------------------------------------
 
 NODE_CLASS_MAPPINGS = {
     "JpgExifStrip": JpgExifStripNode,
+    "MetadataStripDirectory": MetadataStripDirectoryNode,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "JpgExifStrip": "JPG Converter & EXIF Stripper",
+    "MetadataStripDirectory": "Metadata Stripper (Directory, Lossless)",
 }
@@ -0,0 +1,47 @@
+"""
+Test setup: put the node modules on sys.path and provide the two ComfyUI
+modules they import at load time (folder_paths, comfy.cli_args), pointed at
+per-test temporary folders.
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _install_comfy_modules():
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths.models_dir = ""
+    folder_paths.output_directory = ""
+    folder_paths.temp_directory = ""
+    folder_paths.get_output_directory = lambda: folder_paths.output_directory
+    folder_paths.get_temp_directory = lambda: folder_paths.temp_directory
+    sys.modules.setdefault("folder_paths", folder_paths)
+
+    comfy = types.ModuleType("comfy")
+    cli_args = types.ModuleType("comfy.cli_args")
+    cli_args.args = types.SimpleNamespace(disable_metadata=False)
+    comfy.cli_args = cli_args
+    sys.modules.setdefault("comfy", comfy)
+    sys.modules.setdefault("comfy.cli_args", cli_args)
+
+
+_install_comfy_modules()
+
+
+@pytest.fixture
+def comfy_dirs(tmp_path, monkeypatch):
+    """Point folder_paths at fresh models/, output/ and temp/ folders."""
+    import folder_paths
+
+    dirs = {name: tmp_path / name for name in ("models", "output", "temp")}
+    for path in dirs.values():
+        path.mkdir()
+    monkeypatch.setattr(folder_paths, "models_dir", str(dirs["models"]), raising=False)
+    monkeypatch.setattr(folder_paths, "output_directory", str(dirs["output"]), raising=False)
+    monkeypatch.setattr(folder_paths, "temp_directory", str(dirs["temp"]), raising=False)
+    return dirs
@@ -0,0 +1,361 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+pytest.importorskip("requests")
+
+from gitcloner import GitCloneManager  # noqa: E402
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+@pytest.fixture
+def manager(comfy_dirs):
+    return GitCloneManager()
+
+
+# ---------------------------------------------------------------------------
+# parse_repository_line
+# ---------------------------------------------------------------------------
+
+def test_parse_plain_github_url(manager):
+    url, target_dir, target_path, branch, options, error = manager.parse_repository_line(
+        "https://github.com/ltdrdata/ComfyUI-Manager")
+    assert error is None
+    assert url == "https://github.com/ltdrdata/ComfyUI-Manager"
+    assert target_path == "custom_nodes/ComfyUI-Manager"
+    assert target_dir == os.path.join(manager.custom_nodes_path, "ComfyUI-Manager")
+    assert branch is None
+    assert options == {"source": "git"}
+
+
+def test_parse_huggingface_url_defaults_to_hf_repos(manager):
+    _, target_dir, target_path, _, _, error = manager.parse_repository_line(
+        "https://huggingface.co/runwayml/stable-diffusion-v1-5")
+    assert error is None
+    assert target_path == "models/hf_repos/stable-diffusion-v1-5"
+    assert target_dir == os.path.join(manager.models_path, "hf_repos/stable-diffusion-v1-5")
+
+
+def test_parse_custom_path_and_branch_anywhere_on_line(manager):
+    _, target_dir, target_path, branch, _, error = manager.parse_repository_line(
+        "https://github.com/user/repo models/sd15 branch:dev")
+    assert error is None
+    assert branch == "dev"
+    assert target_path == "models/sd15"
+    assert target_dir == os.path.join(manager.models_path, "sd15")
+
+
+def test_parse_sparse_implies_blobless_filter(manager):
+    *_, options, error = manager.parse_repository_line(
+        "https://huggingface.co/org/model sparse:unet/,vae/")
+    assert error is None
+    assert options["sparse"] == ["unet/", "vae/"]
+    assert options["filter"] == "blob:none"
+
+
+def test_parse_explicit_filter_is_kept(manager):
+    *_, options, error = manager.parse_repository_line("filter:tree:0 https://github.com/user/huge-repo")
+    assert error is None
+    assert options["filter"] == "tree:0"
+    assert "sparse" not in options
+
+
+@pytest.mark.parametrize("line, message", [
+    ("", "Empty line"),
+    ("branch:main", "Branch specified but no URL provided"),
+    ("sparse:, https://github.com/user/repo", "sparse: requires at least one path"),
+    ("filter:everything https://github.com/user/repo", "Unsupported clone filter: everything"),
+    ("mode:zip https://github.com/user/repo", "Unsupported mode: zip"),
+])
+def test_parse_rejects_invalid_lines(manager, line, message):
+    *_, error = manager.parse_repository_line(line)
+    assert error == message
+
+
+@pytest.mark.parametrize("line, source", [
+    ("/mnt/usb/ComfyUI-Manager.bundle", "bundle"),
+    ("https://example.com/releases/my-node.tar.gz custom_nodes/my-node", "archive"),
+    ("https://github.com/user/repo/archive/refs/heads/main.zip", "archive"),
+    ("mode:archive https://github.com/ltdrdata/ComfyUI-Manager", "archive"),
+    ("https://github.com/ltdrdata/ComfyUI-Manager", "git"),
+])
+def test_parse_detects_source(manager, line, source):
+    *_, options, error = manager.parse_repository_line(line)
+    assert error is None
+    assert options["source"] == source
+
+
+def test_parse_origin_option(manager):
+    *_, options, error = manager.parse_repository_line(
+        "/mnt/usb/ComfyUI-Manager.bundle origin:https://github.com/ltdrdata/ComfyUI-Manager")
+    assert error is None
+    assert options["origin"] == "https://github.com/ltdrdata/ComfyUI-Manager"
+
+
+# ---------------------------------------------------------------------------
+# read_packed_refs
+# ---------------------------------------------------------------------------
+
+def test_read_packed_refs_skips_comments_and_peeled_lines(manager, tmp_path):
+    (tmp_path / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted \n"
+        f"{SHA} refs/heads/main\n"
+        f"{'1' * 40} refs/tags/v1.0\n"
+        f"^{'2' * 40}\n"
+        "\n"
+    )
+    assert manager.read_packed_refs(str(tmp_path)) == {
+        "refs/heads/main": SHA,
+        "refs/tags/v1.0": "1" * 40,
+    }
+
+
+def test_read_packed_refs_missing_file(manager, tmp_path):
+    assert manager.read_packed_refs(str(tmp_path)) == {}
+
+
+def test_read_packed_refs_rereads_after_change(manager, tmp_path):
+    packed_file = tmp_path / "packed-refs"
+    packed_file.write_text(f"{SHA} refs/heads/main\n")
+    os.utime(packed_file, ns=(1_000_000_000, 1_000_000_000))
+    assert manager.read_packed_refs(str(tmp_path)) == {"refs/heads/main": SHA}
+
+    packed_file.write_text(f"{'3' * 40} refs/heads/main\n")
+    os.utime(packed_file, ns=(2_000_000_000, 2_000_000_000))
+    assert manager.read_packed_refs(str(tmp_path)) == {"refs/heads/main": "3" * 40}
+
+
+# ---------------------------------------------------------------------------
+# extract_archive / provision_from_archive
+# ---------------------------------------------------------------------------
+
+def make_tar(path, members, comment=None):
+    """members: (name, "file" | "dir" | "symlink", content or link target)"""
+    pax_headers = {"comment": comment} if comment else {}
+    with tarfile.open(path, "w:gz", format=tarfile.PAX_FORMAT, pax_headers=pax_headers) as archive:
+        for name, kind, value in members:
+            info = tarfile.TarInfo(name)
+            if kind == "symlink":
+                info.type, info.linkname = tarfile.SYMTYPE, value
+                archive.addfile(info)
+            elif kind == "dir":
+                info.type = tarfile.DIRTYPE
+                archive.addfile(info)
+            else:
+                info.size = len(value)
+                archive.addfile(info, io.BytesIO(value))
+
+
+@pytest.fixture
+def extract_dir(tmp_path):
+    path = tmp_path / "sandbox" / "extract"
+    path.mkdir(parents=True)
+    return path
+
+
+def test_extract_tar_with_internal_symlinks(manager, tmp_path, extract_dir):
+    archive = tmp_path / "repo.tar.gz"
+    make_tar(archive, [
+        ("repo-main", "dir", None),
+        ("repo-main/file.txt", "file", b"hello"),
+        ("repo-main/link.txt", "symlink", "file.txt"),
+        ("repo-main/sub/up.txt", "symlink", "../file.txt"),
+    ], comment=SHA)
+
+    assert manager.extract_archive(str(archive), str(extract_dir)) == SHA
+    assert (extract_dir / "repo-main" / "link.txt").read_bytes() == b"hello"
+    assert (extract_dir / "repo-main" / "sub" / "up.txt").read_bytes() == b"hello"
+
+
+def test_extract_tar_ignores_non_sha_comment(manager, tmp_path, extract_dir):
+    archive = tmp_path / "repo.tar.gz"
+    make_tar(archive, [("file.txt", "file", b"x")], comment="--not-a-sha")
+    assert manager.extract_archive(str(archive), str(extract_dir)) is None
+
+
+@pytest.mark.parametrize("members", [
+    [("../evil", "file", b"x")],
+    [("/tmp/evil", "file", b"x")],
+    [("link", "symlink", "../../evil")],
+    [("link", "symlink", "/tmp")],
+    # Each link stays inside on its own; only resolving the chain shows the escape
+    [("d", "symlink", "."), ("d/e", "symlink", ".."), ("d/e/evil", "file", b"x")],
+    # A later member must not write through a symlink extracted earlier
+    [("a", "symlink", "b"), ("a", "file", b"x")],
+], ids=["dotdot", "absolute", "symlink-out", "symlink-absolute", "symlink-chain", "write-through-symlink"])
+def test_extract_tar_rejects_escapes(manager, tmp_path, extract_dir, members):
+    archive = tmp_path / "evil.tar.gz"
+    make_tar(archive, members)
+
+    with pytest.raises(ValueError):
+        manager.extract_archive(str(archive), str(extract_dir))
+    assert not (tmp_path / "sandbox" / "evil").exists()
+    assert not (tmp_path / "evil").exists()
+
+
+def test_extract_zip_returns_comment_sha(manager, tmp_path, extract_dir):
+    archive = tmp_path / "repo.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("repo-main/", "")
+        zf.writestr("repo-main/nested/file.txt", b"hello")
+        zf.comment = SHA.encode()
+
+    assert manager.extract_archive(str(archive), str(extract_dir)) == SHA
+    assert (extract_dir / "repo-main" / "nested" / "file.txt").read_bytes() == b"hello"
+
+
+def test_extract_zip_rejects_dotdot(manager, tmp_path, extract_dir):
+    archive = tmp_path / "evil.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("../evil", b"x")
+
+    with pytest.raises(ValueError):
+        manager.extract_archive(str(archive), str(extract_dir))
+    assert not (tmp_path / "sandbox" / "evil").exists()
+
+
+def test_archive_refuses_existing_target_before_downloading(manager, tmp_path, monkeypatch):
+    target_dir = tmp_path / "custom_nodes" / "repo"
+    target_dir.mkdir(parents=True)
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("should not resolve or download")
+
+    monkeypatch.setattr(manager, "resolve_archive_url", unexpected)
+    monkeypatch.setattr(manager, "download_archive", unexpected)
+    record, error = manager.provision_from_archive(
+        "https://github.com/user/repo", str(target_dir), "custom_nodes/repo", None, "key", {}, False, "")
+    assert record is None
+    assert error == "Directory already exists. Use force_update to overwrite."
+
+
+
+
+# ---------------------------------------------------------------------------
+# Directory size cache
+# ---------------------------------------------------------------------------
+
+def test_pruned_mirror_leaves_no_cached_sizes(manager, monkeypatch):
+    monkeypatch.setattr(GitCloneManager, "_dir_size_cache", {})
+    mirrors = []
+    for index, name in enumerate(("old-000000000000.git", "new-000000000000.git")):
+        mirror_dir = os.path.join(manager.mirror_cache_path, name)
+        os.makedirs(os.path.join(mirror_dir, "objects", "pack"))
+        with open(os.path.join(mirror_dir, "objects", "pack", "pack.pack"), "wb") as f:
+            f.write(b"x" * 1024 * 1024)
+        os.utime(mirror_dir, (1_000_000 + index, 1_000_000 + index))
+        mirrors.append(mirror_dir)
+
+    stats = manager.prune_mirror_cache(1.5 / 1024)
+    assert stats["pruned"] == 1 and not os.path.exists(mirrors[0])
+    cached = list(GitCloneManager._dir_size_cache)
+    assert cached and not any(path.startswith(mirrors[0]) for path in cached)
+
+
+# ---------------------------------------------------------------------------
+# restore_repository
+# ---------------------------------------------------------------------------
+
+def git(*args):
+    import subprocess
+
+    return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.mark.parametrize("path", [".", "", "custom_nodes/..", "../outside"])
+def test_restore_rejects_paths_outside_subfolders(manager, path):
+    result = manager.restore_repository({"url": "https://github.com/user/repo", "sha": SHA, "path": path}, 0, "", "")
+    assert result == {"state": "error", "message": "Path must be a folder inside the ComfyUI folder"}
+
+
+def test_restore_updates_branch_tracking_ref(manager, tmp_path):
+    upstream = tmp_path / "upstream"
+    git("init", "-q", "-b", "main", str(upstream))
+    for message in ("first", "second"):
+        git("-C", str(upstream), "-c", "user.name=t", "-c", "user.email=t@example.com",
+            "commit", "-q", "--allow-empty", "-m", message)
+    pinned = git("-C", str(upstream), "rev-parse", "HEAD~1")
+    tip = git("-C", str(upstream), "rev-parse", "HEAD")
+
+    entry = {"url": str(upstream), "sha": pinned, "branch": "main", "path": "custom_nodes/repo"}
+    assert manager.restore_repository(entry, 0, "", "")["state"] == "restored"
+
+    target_dir = os.path.join(manager.custom_nodes_path, "repo")
+    assert git("-C", target_dir, "rev-parse", "HEAD") == pinned
+    assert git("-C", target_dir, "rev-parse", "refs/remotes/origin/main") == tip
+
+
+
+# ---------------------------------------------------------------------------
+# Background maintenance
+# ---------------------------------------------------------------------------
+
+def test_interrupt_stops_maintenance_after_clone_run_clears_its_flag(manager, tmp_path, monkeypatch):
+    import threading
+
+    target_dirs = []
+    for name in ("a", "b", "c"):
+        target_dir = tmp_path / "custom_nodes" / name
+        (target_dir / ".git").mkdir(parents=True)
+        target_dirs.append(str(target_dir))
+        manager.clone_history[str(target_dir)] = {"target_path": f"custom_nodes/{name}"}
+
+    started, release, maintained = threading.Event(), threading.Event(), []
+
+    def maintain_repository(target_dir, maintenance_supported=True):
+        started.set()
+        release.wait(5)
+        maintained.append(target_dir)
+        return {"error": None}
+
+    monkeypatch.setattr(manager, "has_git_maintenance", lambda: True)
+    monkeypatch.setattr(manager, "maintain_repository", maintain_repository)
+    assert manager.start_maintenance() == 3
+    assert started.wait(5)
+
+    manager.interrupt_clones()
+    manager.interrupt_flag.clear()  # as the next clone_repositories run does on entry
+    release.set()
+    manager.maintenance_thread.join(5)
+
+    assert len(maintained) == 1
+
+    # A new maintenance run is not blocked by the earlier interrupt
+    started.clear()
+    maintained.clear()
+    assert manager.start_maintenance() == 3
+    manager.maintenance_thread.join(5)
+    assert len(maintained) == 3
+
+
+# ---------------------------------------------------------------------------
+# Inventory
+# ---------------------------------------------------------------------------
+
+def test_inventory_skips_repository_that_fails_to_scan(manager, comfy_dirs, monkeypatch):
+    import subprocess
+
+    for name in ("good", "slow"):
+        subprocess.run(["git", "init", "-q", os.path.join(manager.custom_nodes_path, name)], check=True)
+
+    real_run = subprocess.run
+
+    def run(cmd, *args, **kwargs):
+        if "status" in cmd and cmd[cmd.index("-C") + 1].endswith("slow"):
+            raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+        return real_run(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    listing = manager.get_inventory_list()
+    assert "=== REPOSITORY INVENTORY === 1/2 repositories (1 rescanned" in listing
+    assert "1 could not be scanned" in listing
+    assert "custom_nodes/good" in listing and "slow" not in listing.split("\n", 1)[1]
+
+    # The failed repository is retried, and listed, on the next call
+    monkeypatch.setattr(subprocess, "run", real_run)
+    listing = manager.get_inventory_list()
+    assert "=== REPOSITORY INVENTORY === 2/2 repositories (1 rescanned" in listing
@@ -0,0 +1,269 @@
+import io
+import os
+import struct
+import threading
+
+import pytest
+
+pytest.importorskip("torch")
+Image = pytest.importorskip("PIL.Image")
+PngImagePlugin = pytest.importorskip("PIL.PngImagePlugin")
+
+from jpg_exif_strip_node import (  # noqa: E402
+    JpgExifStripNode,
+    MetadataStripDirectoryNode,
+    _jpeg_metadata_ranges,
+    _png_metadata_ranges,
+    _webp_metadata_ranges,
+    strip_file_metadata,
+)
+
+XMP = b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF/></x:xmpmeta>'
+
+
+def exif_bytes():
+    exif = Image.Exif()
+    exif[0x0110] = 'prompt:{"seed": 1}'
+    return exif.tobytes()
+
+
+def sample_image(mode="RGB"):
+    image = Image.new(mode, (32, 24))
+    image.putdata([((x * 8) % 256, (y * 10) % 256, 128, 200)[:len(mode)] for y in range(24) for x in range(32)])
+    return image
+
+
+def encode(image, **params):
+    buf = io.BytesIO()
+    image.save(buf, **params)
+    return buf.getvalue()
+
+
+def dropped(data, ranges):
+    """The bytes of data with the given (start, end) ranges removed."""
+    kept, position = [], 0
+    for start, end in ranges:
+        kept.append(data[position:start])
+        position = end
+    kept.append(data[position:])
+    return b"".join(kept)
+
+
+# ---------------------------------------------------------------------------
+# Container parsers
+# ---------------------------------------------------------------------------
+
+def test_jpeg_ranges_cover_app1_segments():
+    data = encode(sample_image(), format="JPEG", exif=exif_bytes(), xmp=XMP)
+    ranges, patches = _jpeg_metadata_ranges(io.BytesIO(data))
+
+    assert len(ranges) == 2  # EXIF and XMP both live in APP1
+    assert all(data[start:start + 2] == b"\xff\xe1" for start, _ in ranges)
+    assert patches == {}
+    stripped = dropped(data, ranges)
+    assert b"Exif\x00\x00" not in stripped and XMP not in stripped
+
+
+def test_jpeg_ranges_cover_app13():
+    data = encode(sample_image(), format="JPEG")
+    payload = b"Photoshop 3.0\x00" + b"8BIM" + b"\x00" * 16
+    app13 = b"\xff\xed" + struct.pack(">H", len(payload) + 2) + payload
+    data = data[:2] + app13 + data[2:]
+
+    ranges, _ = _jpeg_metadata_ranges(io.BytesIO(data))
+    assert ranges == [(2, 2 + len(app13))]
+
+
+def test_jpeg_clean_file_and_non_jpeg():
+    assert _jpeg_metadata_ranges(io.BytesIO(encode(sample_image(), format="JPEG"))) == ([], {})
+    assert _jpeg_metadata_ranges(io.BytesIO(b"not a jpeg")) is None
+
+
+def test_png_ranges_cover_text_chunks_and_exif():
+    info = PngImagePlugin.PngInfo()
+    info.add_text("prompt", '{"seed": 1}')
+    info.add_text("workflow", "z" * 1000, zip=True)
+    info.add_itxt("parameters", "ü")
+    data = encode(sample_image("RGBA"), format="PNG", pnginfo=info, exif=exif_bytes())
+    ranges, patches = _png_metadata_ranges(io.BytesIO(data))
+
+    assert sorted(data[start + 4:start + 8] for start, _ in ranges) == [b"eXIf", b"iTXt", b"tEXt", b"zTXt"]
+    assert patches == {}
+    assert dropped(data, ranges) == encode(sample_image("RGBA"), format="PNG")
+
+
+def test_png_non_png():
+    assert _png_metadata_ranges(io.BytesIO(b"\x89PNX....")) is None
+
+
+def test_webp_ranges_and_header_patches():
+    data = encode(sample_image("RGBA"), format="WEBP", lossless=True, exif=exif_bytes(), xmp=XMP)
+    ranges, patches = _webp_metadata_ranges(io.BytesIO(data))
+
+    assert sorted(data[start:start + 4] for start, _ in ranges) == [b"EXIF", b"XMP "]
+    stripped = bytearray(dropped(data, ranges))
+    for offset, value in patches.items():
+        stripped[offset:offset + len(value)] = value
+    assert struct.unpack("<I", stripped[4:8])[0] == len(stripped) - 8
+    assert stripped[12:16] == b"VP8X" and stripped[20] & 0x0C == 0
+
+    image = Image.open(io.BytesIO(bytes(stripped)))
+    assert image.tobytes() == sample_image("RGBA").tobytes()
+    assert "exif" not in image.info and "xmp" not in image.info
+
+
+def test_webp_non_webp():
+    assert _webp_metadata_ranges(io.BytesIO(b"RIFF\x00\x00\x00\x00WAVE")) is None
+
+
+# ---------------------------------------------------------------------------
+# strip_file_metadata / directory mode
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("name, params", [
+    ("a.jpg", {"format": "JPEG", "exif": exif_bytes(), "xmp": XMP}),
+    ("b.png", {"format": "PNG", "exif": exif_bytes()}),
+    ("c.webp", {"format": "WEBP", "lossless": True, "exif": exif_bytes(), "xmp": XMP}),
+])
+def test_strip_file_keeps_pixels_and_mtime(tmp_path, name, params):
+    path = tmp_path / name
+    sample_image().save(path, **params)
+    with Image.open(path) as image:
+        pixels = image.tobytes()
+    os.utime(path, ns=(1_500_000_000_000_000_000, 1_500_000_000_000_000_000))
+
+    status, removed = strip_file_metadata(str(path))
+
+    assert status == "stripped" and removed > 0
+    assert os.stat(path).st_mtime_ns == 1_500_000_000_000_000_000
+    with Image.open(path) as image:
+        assert image.tobytes() == pixels
+        assert not image.getexif()
+    assert strip_file_metadata(str(path)) == ("clean", 0)
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_strip_file_skips_unrecognised(tmp_path):
+    path = tmp_path / "fake.jpg"
+    path.write_bytes(b"not a jpeg")
+    assert strip_file_metadata(str(path)) == ("skipped", 0)
+    assert path.read_bytes() == b"not a jpeg"
+
+
+def test_strip_file_follows_symlink(tmp_path):
+    target = tmp_path / "real.jpg"
+    sample_image().save(target, format="JPEG", exif=exif_bytes())
+    link = tmp_path / "link.jpg"
+    link.symlink_to(target)
+
+    assert strip_file_metadata(str(link))[0] == "stripped"
+    assert link.is_symlink()
+    with Image.open(target) as image:
+        assert not image.getexif()
+    assert sorted(os.listdir(tmp_path)) == ["link.jpg", "real.jpg"]
+
+
+def test_strip_file_removes_temp_file_on_failure(tmp_path, monkeypatch):
+    path = tmp_path / "a.jpg"
+    sample_image().save(path, format="JPEG", exif=exif_bytes())
+    original = path.read_bytes()
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        strip_file_metadata(str(path))
+    assert os.listdir(tmp_path) == ["a.jpg"]
+    assert path.read_bytes() == original
+
+
+def test_strip_directory_skips_symlinks(comfy_dirs, tmp_path):
+    outside = tmp_path / "outside.jpg"
+    sample_image().save(outside, format="JPEG", exif=exif_bytes())
+    original = outside.read_bytes()
+    root = comfy_dirs["output"] / "tree"
+    root.mkdir()
+    (root / "link.jpg").symlink_to(outside)
+
+    report = MetadataStripDirectoryNode().strip_directory("tree")["result"][0]
+    assert report.startswith("Stripped 0 file(s), 0 already clean")
+    assert outside.read_bytes() == original
+
+
+def test_strip_directory_resumes(comfy_dirs):
+    root = comfy_dirs["output"] / "tree"
+    (root / "sub").mkdir(parents=True)
+    sample_image().save(root / "a.jpg", format="JPEG", exif=exif_bytes())
+    sample_image().save(root / "sub" / "b.png", format="PNG", exif=exif_bytes())
+    (root / "notes.txt").write_text("ignored")
+    # May belong to another run still in progress, so it must be left alone
+    (root / ".a.jpg.0123456789ab.strip-tmp").write_bytes(b"someone else's temp file")
+
+    node = MetadataStripDirectoryNode()
+    first = node.strip_directory("tree", workers=2)["result"][0]
+    assert first.startswith("Stripped 2 file(s), 0 already clean, 0 done in an earlier run")
+    assert (root / ".a.jpg.0123456789ab.strip-tmp").read_bytes() == b"someone else's temp file"
+
+    second = node.strip_directory("tree")["result"][0]
+    assert second.startswith("Stripped 0 file(s), 0 already clean, 2 done in an earlier run")
+
+    third = node.strip_directory("tree", resume=False)["result"][0]
+    assert third.startswith("Stripped 0 file(s), 2 already clean, 0 done in an earlier run")
+
+
+# ---------------------------------------------------------------------------
+# _reserve_output_path
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def fresh_counters(monkeypatch):
+    monkeypatch.setattr(JpgExifStripNode, "_next_index", {})
+
+
+def test_reserve_continues_after_existing_files(comfy_dirs, fresh_counters):
+    folder = comfy_dirs["output"] / "jpg_converted"
+    folder.mkdir()
+    for name in ("img_0003.jpg", "IMG_0007.JPG", "img_12345.jpg", "other_0099.jpg", "img_0100.png"):
+        (folder / name).write_bytes(b"")
+
+    path = JpgExifStripNode()._reserve_output_path("jpg_converted", "img")
+    assert os.path.basename(path) == "img_12346.jpg"
+    assert os.path.exists(path)
+
+
+def test_reserve_steps_past_names_taken_by_other_processes(comfy_dirs, fresh_counters):
+    node = JpgExifStripNode()
+    first = node._reserve_output_path("jpg_converted", "img")
+    assert os.path.basename(first) == "img_0001.jpg"
+
+    # Another process claims the next names behind the cached counter's back
+    folder = comfy_dirs["output"] / "jpg_converted"
+    (folder / "img_0002.jpg").write_bytes(b"taken")
+    (folder / "img_0003.jpg").write_bytes(b"taken")
+
+    assert os.path.basename(node._reserve_output_path("jpg_converted", "img")) == "img_0004.jpg"
+    assert (folder / "img_0002.jpg").read_bytes() == b"taken"
+
+
+def test_reserve_is_unique_across_threads(comfy_dirs, fresh_counters):
+    node = JpgExifStripNode()
+    paths = []
+
+    def reserve():
+        for _ in range(25):
+            paths.append(node._reserve_output_path("jpg_converted", "img"))
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(paths)) == 200
+    assert sorted(os.path.basename(p) for p in paths) == [f"img_{i:04d}.jpg" for i in range(1, 201)]
+
+
+def test_reserve_sanitizes_folder_and_prefix(comfy_dirs, fresh_counters):
+    path = JpgExifStripNode()._reserve_output_path('a:b', 'x/y')
+    assert path == os.path.join(str(comfy_dirs["output"]), "a_b", "x_y_0001.jpg")
@@ -1,31 +1,162 @@
 import folder_paths
 from comfy.cli_args import args
 
-from PIL import Image, ImageDraw
+from PIL import Image
 import numpy as np
 import os
 import zipfile
 import json
+import functools
+import logging
+import hashlib
+import shutil
+import subprocess
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
+import torch
+
+try:
+    import resource  # Peak RSS reporting, POSIX only
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+@functools.lru_cache(maxsize=8)
+def create_checkerboard(width, height, size=30, color1=(140, 140, 140), color2=(113, 113, 113)):
+    """Checkerboard background as a read-only (height, width, 3) float32 array, built once per resolution by tiling"""
+    tile = np.empty((2 * size, 2 * size, 3), dtype=np.float32)
+    tile[:, :] = color1
+    tile[:size, :size] = color2
+    tile[size:, size:] = color2
+    reps = (-(-height // (2 * size)), -(-width // (2 * size)), 1)
+    board = np.tile(tile, reps)[:height, :width]
+    board.flags.writeable = False
+    return board
+
+def get_peak_rss_mb():
+    """Lifetime peak resident set size of this process in MB, or None where it cannot be read"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def get_alpha_source(images_alpha, mask, invert_mask):
+    """Single-channel (B, H, W) alpha from a MASK, or from an IMAGE whose channels are all equal.
+
+    Other IMAGE inputs are returned as-is and averaged per window in convert_frames.
+    """
+    if mask is not None:
+        alpha = mask if mask.dim() == 3 else mask.reshape((-1,) + tuple(mask.shape[-2:]))
+        return 1. - alpha if invert_mask else alpha
+    if images_alpha is None:
+        raise ValueError("TransparentVideoSave needs either images_alpha or mask")
+    if images_alpha.shape[-1] == 1 or all(torch.equal(images_alpha[..., 0], images_alpha[..., c]) for c in range(1, min(images_alpha.shape[-1], 3))):
+        return images_alpha[..., 0]
+    return images_alpha
+
+def get_frame_runs(digests, start, count):
+    """(first frame, length) of each run of identical consecutive frames in start:start+count"""
+    runs = []
+    for index in range(start, start + count):
+        if runs and digests[index] == digests[runs[-1][0]]:
+            runs[-1][1] += 1
+        else:
+            runs.append([index, 1])
+    return runs
+
+def convert_frames(images_rgb, alpha_source, start, end):
+    """RGB scaled to 0-255 and the alpha (0-1, one channel) of frames start:end, in float32"""
+    image_rgb = np.clip(images_rgb[start:end].cpu().numpy() * np.float32(255.), 0, 255)
+    image_alpha = alpha_source[start:end].cpu().numpy()
+    if image_alpha.ndim == 3:
+        alpha_channel = np.clip(image_alpha[..., None].astype(np.float32, copy=False), 0, 1)
+    else:
+        alpha_channel = np.clip((image_alpha[..., 0:1] + image_alpha[..., 1:2] + image_alpha[..., 2:3]) / np.float32(3.), 0, 1)
+    return image_rgb, alpha_channel
+
+class StreamedFrames(Image.Image):
+    """Multi-frame image whose frames are produced on demand.
+
+    Pillow's animated WebP writer seeks through n_frames one by one, so only the
+    window of frames around the current position has to exist in memory.
+    """
+
+    def __init__(self, load_frame, start, n_frames):
+        super().__init__()
+        self._load_frame = load_frame
+        self._start = start
+        self._frame = 0
+        self._loaded = -1
+        self.n_frames = n_frames
+        self.is_animated = n_frames > 1
+        self.seek(0)
+
+    def seek(self, frame):
+        if not 0 <= frame < self.n_frames:
+            raise EOFError("attempt to seek outside sequence")
+        # Frames are produced once; the writer's final rewind to frame 0 keeps the current pixels
+        if frame > self._loaded:
+            image = self._load_frame(self._start + frame)
+            self.im = image.im
+            self._mode = image.mode
+            self._size = image.size
+            if not isinstance(Image.Image.__dict__.get("mode"), property):
+                self.mode = image.mode
+                self.size = image.size
+            self._loaded = frame
+        self._frame = frame
+
+    def tell(self):
+        return self._frame
 
 class TransparentVideoSave:
     def __init__(self):
         self.output_dir = folder_paths.get_output_directory()
         self.type = "output"
         self.prefix_append = ""
+        self.frame_window = 8
+        self.preview_max_size = 512
+        self.preview_max_fps = 12
+        self.preview_max_frames = 120
+        self.preview_quality = 70
 
     methods = {"default": 4, "fastest": 0, "slowest": 6}
+    # proxy_background writes outlive the node call; the pool's threads are joined at interpreter exit
+    background_executor = None
+    background_lock = threading.Lock()
+    background_failures = deque(maxlen=20)
+    # PNG frames are already deflated, so storing them is as small as deflating them again
+    zip_compressions = {"stored": zipfile.ZIP_STORED, "deflated": zipfile.ZIP_DEFLATED}
+    # Output format -> file extension; only the first flattens onto a checkerboard and adds a PNG zip
+    output_formats = {"webp_preview+zip": "webp", "webp_rgba": "webp", "apng": "png",
+                      "webm_vp9_alpha": "webm", "mov_prores4444": "mov"}
     @classmethod
     def INPUT_TYPES(s):
         return {"required":
                     {"images_rgb": ("IMAGE", ),
-                     "images_alpha": ("IMAGE", ),
                      "filename_prefix": ("STRING", {"default": "ComfyUI"}),
                      "fps": ("FLOAT", {"default": 16.0, "min": 0.01, "max": 1000.0, "step": 0.01}),
                      "lossless": ("BOOLEAN", {"default": True}),
                      "quality": ("INT", {"default": 80, "min": 0, "max": 100}),
                      "method": (list(s.methods.keys()),),
-                     # "num_frames": ("INT", {"default": 0, "min": 0, "max": 8192}),
+                     },
+                "optional":
+                    {"images_alpha": ("IMAGE", ),
+                     "mask": ("MASK", ),
+                     "png_compression": ("INT", {"default": 1, "min": 0, "max": 9}),
+                     "zip_compression": (list(s.zip_compressions.keys()),),
+                     "output_format": (list(s.output_formats.keys()),),
+                     "num_frames": ("INT", {"default": 0, "min": 0, "max": 8192}),
+                     "encode_workers": ("INT", {"default": 0, "min": 0, "max": 64}),
+                     "invert_mask": ("BOOLEAN", {"default": False}),
+                     "preview_mode": (["full", "proxy", "proxy_background"],),
+                     "dedupe_frames": ("BOOLEAN", {"default": False}),
                      },
                 "hidden": {"prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO"},
                 }
@@ -37,45 +168,28 @@ class TransparentVideoSave:
 
     CATEGORY = "image/animation"
 
-    def save_images(self, images_rgb, images_alpha, fps, filename_prefix, lossless, quality, method, num_frames=0, prompt=None, extra_pnginfo=None):
+    @classmethod
+    def submit_background(cls, fn):
+        """Queue fn on the shared background writer, creating it on first use"""
+        with cls.background_lock:
+            if cls.background_executor is None:
+                cls.background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TransparentVideoSave")
+            return cls.background_executor.submit(fn)
+
+    def save_images(self, images_rgb, fps, filename_prefix, lossless, quality, method, images_alpha=None, mask=None, invert_mask=False, num_frames=0, png_compression=1, zip_compression="stored", output_format="webp_preview+zip", encode_workers=0, preview_mode="full", dedupe_frames=False, prompt=None, extra_pnginfo=None):
         method = self.methods.get(method)
         filename_prefix += self.prefix_append
         full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path(filename_prefix, self.output_dir, images_rgb[0].shape[1], images_rgb[0].shape[0])
         results: list[FileLocator] = []
+        # ru_maxrss never goes down, so only the rise over this value is attributable to this save
+        peak_rss_before = get_peak_rss_mb()
 
-        def create_checkerboard(size=30, pattern_size=(830, 480), color1=(140, 140, 140), color2=(113, 113, 113)):
-            img = Image.new('RGB', (pattern_size[0], pattern_size[1]), color1)
-            draw = ImageDraw.Draw(img)
-            for i in range(0, pattern_size[0], size):
-                for j in range(0, pattern_size[1], size):
-                    if (i + j) // size % 2 == 0:
-                        draw.rectangle([i, j, i+size, j+size], fill=color2)
-            return img
-
-        pil_images = []
-        np_images = []
-        for image_rgb, image_alpha in zip(images_rgb, images_alpha):
-
-            def image_to_np(image):
-                i = 255. * image.cpu().numpy()
-                return np.clip(i, 0, 255)
-            
-            def image_to_single_color_np(image):
-                i = 1. * image.cpu().numpy()
-                i = (i[:,:,0:1] + i[:,:,1:2] + i[:,:,2:3]) / 3.
-                return np.clip(i, 0, 1)
-            
-            image_rgb = image_to_np(image_rgb)
-            alpha_channel = image_to_single_color_np(image_alpha)
-
-            np_images.append(np.concatenate([image_rgb[:,:,::-1], alpha_channel*255], axis=2).astype(np.uint8))
-            checkerboard = create_checkerboard(pattern_size=(image_rgb.shape[1], image_rgb.shape[0]))
-
-            images = image_rgb * alpha_channel + checkerboard * (1-alpha_channel)
-            img = Image.fromarray(images.astype(np.uint8))
-            pil_images.append(img)
-
-        metadata = pil_images[0].getexif()
+        # A MASK (or an IMAGE with equal channels) is carried as one channel from here on
+        alpha_source = get_alpha_source(images_alpha, mask, invert_mask)
+        frame_count = min(len(images_rgb), len(alpha_source))
+        checkerboard = create_checkerboard(images_rgb.shape[2], images_rgb.shape[1])
+
+        metadata = Image.Exif()
         if not args.disable_metadata:
             if prompt is not None:
                 metadata[0x0110] = "prompt:{}".format(json.dumps(prompt))
@@ -86,35 +200,258 @@ class TransparentVideoSave:
                     inital_exif -= 1
 
         if num_frames == 0:
-            num_frames = len(pil_images)
+            num_frames = frame_count
+
+        # Alpha-capable video needs ffmpeg; without it the same frames go into an RGBA WebP
+        format_note = ""
+        if output_format in ("webm_vp9_alpha", "mov_prores4444") and shutil.which("ffmpeg") is None:
+            format_note = f" ({output_format} needs ffmpeg on PATH, saved webp_rgba instead)"
+            output_format = "webp_rgba"
+        flattened = output_format == "webp_preview+zip"
+        extension = self.output_formats.get(output_format, "webp")
+        exif_bytes = metadata.tobytes()
+
+        segment_count = -(-frame_count // num_frames)
+        zip_path = os.path.join(full_output_folder, f"{filename}_{counter + segment_count - 1:05}.zip")
+        if flattened:
+            print("Saving zip tp", zip_path)
+
+        def hash_frames():
+            # One cheap pass over the uint8 RGBA frames; equal digests mean pixel-identical frames
+            digests = []
+            for start in range(0, frame_count, self.frame_window):
+                image_rgb, alpha_channel = convert_frames(images_rgb, alpha_source, start, min(start + self.frame_window, frame_count))
+                rgba = np.empty(image_rgb.shape[:-1] + (4,), dtype=np.uint8)
+                rgba[..., :3] = image_rgb
+                rgba[..., 3:] = alpha_channel * np.float32(255.)
+                digests.extend(hashlib.blake2b(frame, digest_size=16).digest() for frame in rgba)
+            return digests
+
+        def make_frame_loader(start, end):
+            # Each segment converts its own windows; only the current window is held in memory
+            state = {"window_start": start, "window": []}
+
+            def load_window(index):
+                if not state["window_start"] <= index < state["window_start"] + len(state["window"]):
+                    window_end = min(index + self.frame_window, end)
+                    image_rgb, alpha_channel = convert_frames(images_rgb, alpha_source, index, window_end)
+                    if flattened:
+                        composite = image_rgb - checkerboard
+                        composite *= alpha_channel
+                        composite += checkerboard
+                        window = composite.astype(np.uint8)
+                    else:
+                        window = np.empty(image_rgb.shape[:-1] + (4,), dtype=np.uint8)
+                        window[..., :3] = image_rgb
+                        window[..., 3:] = alpha_channel * np.float32(255.)
+                    state["window_start"], state["window"] = index, window
+                return state["window"], index - state["window_start"]
+
+            return load_window
+
+        def save_video(path, load_window, start, count):
+            # Raw RGBA frames are piped into ffmpeg, which keeps the alpha plane in the codec
+            if output_format == "webm_vp9_alpha":
+                codec = ["-c:v", "libvpx-vp9", "-pix_fmt", "yuva420p", "-auto-alt-ref", "0", "-b:v", "0"]
+                codec += ["-lossless", "1"] if lossless else ["-crf", str(round(63 - quality * 0.63))]
+            else:
+                codec = ["-c:v", "prores_ks", "-profile:v", "4444", "-pix_fmt", "yuva444p10le", "-vendor", "apl0"]
+            if not args.disable_metadata and prompt is not None:
+                codec += ["-metadata", "comment=prompt:{}".format(json.dumps(prompt))]
+            height, width = images_rgb.shape[1], images_rgb.shape[2]
+            ffmpeg = subprocess.Popen(["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+                                       "-s", f"{width}x{height}", "-r", str(fps), "-i", "-"] + codec + [path],
+                                      stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                index = start
+                while index < start + count:
+                    window, offset = load_window(index)
+                    frames = window[offset:offset + start + count - index]
+                    ffmpeg.stdin.write(frames.tobytes())
+                    index += len(frames)
+            except BrokenPipeError:
+                pass
+            _, error = ffmpeg.communicate()
+            if ffmpeg.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed to write {path}: {error.decode(errors='replace').strip()}")
 
-        c = len(pil_images)
-        for i in range(0, c, num_frames):
-            file = f"{filename}_{counter:05}_.webp"
-            pil_images[i].save(os.path.join(full_output_folder, file), save_all=True, duration=int(1000.0/fps), append_images=pil_images[i + 1:i + num_frames], exif=metadata, lossless=lossless, quality=quality, method=method)
+        def encode_segment(file_path, start, count, digests):
+            # Pillow's WebP/PNG encoders and ffmpeg run outside the GIL, so segments encode in parallel threads
+            segment_start = time.time()
+            load_window = make_frame_loader(start, start + count)
+            # A held frame is encoded once and shown for the length of its run
+            runs = get_frame_runs(digests, start, count) if digests else [[j, 1] for j in range(start, start + count)]
+            durations = [length * int(1000.0/fps) for _, length in runs]
+
+            def load_frame(run):
+                window, offset = load_window(runs[run][0])
+                return Image.fromarray(window[offset])
+
+            if extension in ("webm", "mov"):
+                # Raw video is piped at a constant rate, so every frame is written
+                save_video(file_path, load_window, start, count)
+                return time.time() - segment_start, 0
+            elif extension == "png":
+                # Pillow's APNG writer reads the frames twice and keeps them all, so hand it a uint8 list
+                frames = [load_frame(j) for j in range(len(runs))]
+                frames[0].save(file_path, format="PNG", save_all=True, duration=durations, loop=0, append_images=frames[1:], exif=exif_bytes, compress_level=png_compression)
+            else:
+                StreamedFrames(load_frame, 0, len(runs)).save(file_path, format="WEBP", save_all=True, duration=durations, exif=exif_bytes, lossless=lossless, quality=quality, method=method)
+            return time.time() - segment_start, count - len(runs)
+
+        # cv2 releases the GIL while encoding, so PNGs are encoded while the segments encode
+        def encode_png(img):
+            return cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, png_compression])
+
+        def write_zip(zipf, png_executor, digests):
+            # Futures are queued in frame order, so the zip entries stay in frame order
+            pending = deque()
+            stored = {}  # digest -> entry name of the first frame with that content
+            sizes = {}
+            manifest = []
+
+            def write_pending(limit):
+                while len(pending) > limit:
+                    idx, future = pending.popleft()
+                    success, buffer = future.result()
+                    if not success:
+                        print(f"Failed to encode image {idx}, skipping...")
+                    else:
+                        zipf.writestr(f"img_{idx:03d}.png", buffer.tobytes())
+                        sizes[f"img_{idx:03d}.png"] = len(buffer)
+
+            for start in range(0, frame_count, self.frame_window):
+                end = min(start + self.frame_window, frame_count)
+                new_frames = []
+                for idx in range(start, end):
+                    if digests and digests[idx] in stored:
+                        manifest.append(stored[digests[idx]])
+                        continue
+                    if digests:
+                        stored[digests[idx]] = f"img_{idx:03d}.png"
+                    manifest.append(f"img_{idx:03d}.png")
+                    new_frames.append(idx - start)
+                if not new_frames:
+                    continue
+                image_rgb, alpha_channel = convert_frames(images_rgb, alpha_source, start, end)
+                bgra = np.empty(image_rgb.shape[:-1] + (4,), dtype=np.uint8)
+                bgra[..., :3] = image_rgb[..., ::-1]
+                bgra[..., 3:] = alpha_channel * np.float32(255.)
+                pending.extend((start + j, png_executor.submit(encode_png, bgra[j])) for j in new_frames)
+                write_pending(2 * self.frame_window)
+            write_pending(0)
+
+            if not digests:
+                return 0, 0
+            zipf.writestr("manifest.json", json.dumps({"fps": fps, "frames": [name if name in sizes else None for name in manifest]}))
+            duplicates = [name for idx, name in enumerate(manifest) if name != f"img_{idx:03d}.png"]
+            return len(duplicates), sum(sizes.get(name, 0) for name in duplicates)
+
+        def save_preview():
+            # Downscaled, frame-decimated proxy with a fast lossy encode; it is only ever looked at in the browser
+            step = int(max(1, -(-fps // self.preview_max_fps), -(-frame_count // self.preview_max_frames)))
+            scale = min(1., self.preview_max_size / max(images_rgb.shape[1], images_rgb.shape[2]))
+            size = (max(1, round(images_rgb.shape[2] * scale)), max(1, round(images_rgb.shape[1] * scale)))
+            frames = []
+            for index in range(0, frame_count, step):
+                image_rgb, alpha_channel = convert_frames(images_rgb, alpha_source, index, index + 1)
+                if flattened:
+                    frame = (image_rgb[0] * alpha_channel[0] + checkerboard * (1 - alpha_channel[0])).astype(np.uint8)
+                else:
+                    frame = np.concatenate([image_rgb[0], alpha_channel[0] * np.float32(255.)], axis=-1).astype(np.uint8)
+                frames.append(Image.fromarray(frame).resize(size, Image.Resampling.BILINEAR))
+
+            preview_file = f"{os.path.splitext(results[0]['filename'])[0]}preview_{''.join(random.choice('abcdefghijklmnopqrstupvxyz') for x in range(5))}.webp"
+            frames[0].save(os.path.join(folder_paths.get_temp_directory(), preview_file), save_all=True, append_images=frames[1:], duration=int(1000.0 * step / fps), lossless=False, quality=self.preview_quality, method=0)
+            return {"filename": preview_file, "subfolder": "", "type": "temp"}, len(frames) > 1
+
+        def write_outputs(file_paths):
+            digests = hash_frames() if dedupe_frames else None
+            workers = min(encode_workers or os.cpu_count() or 1, segment_count)
+            with ThreadPoolExecutor(max_workers=workers) as segment_executor:
+                segments = [segment_executor.submit(encode_segment, file_path, i, min(num_frames, frame_count - i), digests)
+                            for file_path, i in zip(file_paths, range(0, frame_count, num_frames))]
+
+                zip_duplicates, zip_bytes_saved = 0, 0
+                if flattened:
+                    with zipfile.ZipFile(zip_path, 'w', self.zip_compressions.get(zip_compression, zipfile.ZIP_STORED)) as zipf, \
+                            ThreadPoolExecutor(max_workers=os.cpu_count()) as png_executor:
+                        zip_duplicates, zip_bytes_saved = write_zip(zipf, png_executor, digests)
+                segment_results = [segment.result() for segment in segments]
+
+            text = ""
+            merged = sum(skipped for _, skipped in segment_results)
+            if merged or zip_duplicates:
+                text += f" | duplicate frames: {merged} of {frame_count} merged into longer durations"
+                if flattened:
+                    text += f", {zip_duplicates} stored once in the zip ({zip_bytes_saved / (1024 * 1024):.1f} MB saved)"
+            if len(segment_results) > 1:
+                text += f" | {len(segment_results)} segments on {workers} workers: " + ", ".join(f"{t:.1f}s" for t, _ in segment_results)
+            return text
+
+        file_paths = []
+        for i in range(0, frame_count, num_frames):
+            file = f"{filename}_{counter:05}_.{extension}"
+            file_paths.append(os.path.join(full_output_folder, file))
             results.append({
                 "filename": file,
                 "subfolder": subfolder,
                 "type": self.type
             })
             counter += 1
-        
-        zip_path = os.path.join(full_output_folder, f"{filename}_{counter-1:05}.zip") 
-        print("Saving zip tp", zip_path)
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for idx, img in enumerate(np_images):
-                success, buffer = cv2.imencode(".png", img)
-                if not success:
-                    print(f"Failed to encode image {idx}, skipping...")
-                    continue
-                
-                filename = f"img_{idx:03d}.png"
-                zipf.writestr(filename, buffer.tobytes())
 
-        animated = num_frames != 1
-        return { "ui": { "images": results, "animated": (animated,), "text": (f"Zip save! {zip_path}",) }}
+        # Claim the names now, so the next prompt's get_save_image_path skips them even before they are written
+        for path in file_paths:
+            open(path, "xb").close()
+
+        def remove_unwritten():
+            for path in file_paths + [zip_path]:
+                if os.path.exists(path) and os.path.getsize(path) == 0:
+                    os.remove(path)
 
+        # Failures of earlier background writes are reported on the next save
+        failure_text = ""
+        while self.background_failures:
+            failure_text += f" | background write failed: {self.background_failures.popleft()}"
+
+        try:
+            preview, preview_animated = save_preview() if preview_mode != "full" else (None, False)
+            if preview_mode == "proxy_background":
+                # The proxy is on disk before the node returns; the full-quality files finish afterwards
+                def write_outputs_in_background():
+                    try:
+                        logging.info(f"TransparentVideoSave: finished {len(file_paths)} file(s) in the background{write_outputs(file_paths)}")
+                    except Exception as e:
+                        logging.exception(f"TransparentVideoSave: background write of {file_paths[0]} failed")
+                        self.background_failures.append(f"{os.path.basename(file_paths[0])}: {e}")
+                        remove_unwritten()
+
+                self.submit_background(write_outputs_in_background)
+                timing_text = " | full-quality files are being written in the background"
+            else:
+                timing_text = write_outputs(file_paths)
+        except Exception:
+            remove_unwritten()
+            raise
+
+        peak_rss = get_peak_rss_mb()
+        rss_text = ""
+        if peak_rss is not None:
+            raised = peak_rss - peak_rss_before
+            rss_text = (f" (process peak RSS {peak_rss:.0f} MB, raised {raised:.0f} MB by this save)" if raised > 0.5
+                        else f" (process peak RSS {peak_rss:.0f} MB, not raised by this save)")
+
+        animated = num_frames != 1
+        if flattened:
+            text = f"Zip save! {zip_path}{rss_text}{timing_text}{failure_text}"
+        else:
+            text = f"Saved {len(results)} {output_format} file(s) to {full_output_folder}{format_note}{rss_text}{timing_text}{failure_text}"
+        if preview:
+            return { "ui": { "images": [preview], "animated": (preview_animated,), "text": (text,) }}
+        if extension in ("webm", "mov"):
+            # The image preview cannot play video containers
+            return { "ui": { "images": [], "animated": (animated,), "text": (text,) }}
+        return { "ui": { "images": results, "animated": (animated,), "text": (text,) }}
 
 NODE_CLASS_MAPPINGS = {
     "TransparentVideoSave": TransparentVideoSave,